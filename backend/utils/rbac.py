@@ -5,9 +5,27 @@ Provides utility functions for permission checking and role management.
 """
 
 from typing import List, Dict, Any
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from backend.models import User, Permission, Role, RolePermission
 
+# Key in Session.info holding get_user_permissions results, by role_id
+_PERMISSION_CACHE_KEY = "rbac_role_permissions"
+
+
+@event.listens_for(Session, "after_flush")
+@event.listens_for(Session, "after_transaction_end")
+def _clear_permission_cache(session, *args):
+    """Drop a session's cached permissions whenever its data may have changed."""
+    session.info.pop(_PERMISSION_CACHE_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _clear_permission_cache_on_write(orm_execute_state):
+    """Statements run through Session.execute() bypass the flush; clear on writes."""
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info.pop(_PERMISSION_CACHE_KEY, None)
+
 
 class RBACUtils:
     """
@@ -119,6 +137,28 @@ class RBACUtils:
         db.refresh(role_permission)
         return role_permission
     
+    @staticmethod
+    def bulk_assign_permissions(db: Session, role_id: int, permission_ids: List[int]) -> None:
+        """
+        Assign several permissions to a role with a single INSERT.
+        
+        Unlike assign_permission_to_role, this does not check that the role
+        and permissions exist or that they are not already assigned; callers
+        must pass IDs they know to be valid.
+        
+        Args:
+            db: Database session
+            role_id: ID of the role
+            permission_ids: IDs of the permissions to assign
+        """
+        if not permission_ids:
+            return
+        db.execute(
+            RolePermission.__table__.insert(),
+            [{"role_id": role_id, "permission_id": permission_id} for permission_id in permission_ids]
+        )
+        db.commit()
+    
     @staticmethod
     def remove_permission_from_role(db: Session, role_id: int, permission_id: int) -> bool:
         """
@@ -165,6 +205,12 @@ class RBACUtils:
         """
         Get all permissions for a user.
         
+        The result is cached per role in the session's info dict, so repeated
+        permission checks within one unit of work only query once. The cache
+        is dropped whenever the session flushes, ends a transaction (commit,
+        rollback or savepoint) or executes a write statement, so it never
+        outlives the data it was read from.
+        
         Args:
             user: The user
             db: Database session
@@ -172,9 +218,15 @@ class RBACUtils:
         Returns:
             List[Permission]: List of permissions
         """
-        return db.query(Permission).join(RolePermission).join(Role).filter(
-            Role.role_id == user.role_id
-        ).all()
+        permissions = db.info.get(_PERMISSION_CACHE_KEY, {}).get(user.role_id)
+        if permissions is None:
+            permissions = db.query(Permission).join(RolePermission).join(Role).filter(
+                Role.role_id == user.role_id
+            ).all()
+            # The query may have autoflushed and cleared the cache; store
+            # into the session's current dict
+            db.info.setdefault(_PERMISSION_CACHE_KEY, {})[user.role_id] = permissions
+        return permissions
     
     @staticmethod
     def get_user_permission_names(user: User, db: Session) -> List[str]:
@@ -283,7 +335,7 @@ class RBACUtils:
         Returns:
             bool: True if user has role, False otherwise
         """
-        return user.role_name == role_name
+        return getattr(user, "role_name", None) == role_name
     
     @staticmethod
     def get_users_with_permission(permission_name: str, db: Session) -> List[User]:
@@ -393,11 +445,17 @@ class RBACUtils:
             ("manage_leave_types", "Manage leave type records"),
         ]
         
-        created_permissions = []
-        for perm_name, perm_desc in default_permissions:
-            if not db.query(Permission).filter(Permission.permission_name == perm_name).first():
-                permission = RBACUtils.create_permission(db, perm_name, perm_desc)
-                created_permissions.append(permission)
+        # Look up existing names once and insert the missing permissions in a
+        # single commit
+        existing = {name for (name,) in db.query(Permission.permission_name).all()}
+        created_permissions = [
+            Permission(permission_name=perm_name, description=perm_desc)
+            for perm_name, perm_desc in default_permissions
+            if perm_name not in existing
+        ]
+        if created_permissions:
+            db.add_all(created_permissions)
+            db.commit()
         
         return created_permissions
     
@@ -413,32 +471,40 @@ class RBACUtils:
             List[Role]: List of created roles
         """
         # Create default roles
+        existing_roles = {name for (name,) in db.query(Role.role_name).all()}
         admin_role = None
         manager_role = None
         employee_role = None
         super_admin_role = None
         
         # Super Admin role
-        if not db.query(Role).filter(Role.role_name == "super_admin").first():
-            super_admin_role = RBACUtils.create_role(db, "super_admin", "Super administrator with full system access")
+        if "super_admin" not in existing_roles:
+            super_admin_role = Role(role_name="super_admin", description="Super administrator with full system access")
         
         # Admin role
-        if not db.query(Role).filter(Role.role_name == "admin").first():
-            admin_role = RBACUtils.create_role(db, "admin", "System administrator with full access")
+        if "admin" not in existing_roles:
+            admin_role = Role(role_name="admin", description="System administrator with full access")
         
         # Manager role
-        if not db.query(Role).filter(Role.role_name == "manager").first():
-            manager_role = RBACUtils.create_role(db, "manager", "Department manager with management access")
+        if "manager" not in existing_roles:
+            manager_role = Role(role_name="manager", description="Department manager with management access")
         
         # Employee role
-        if not db.query(Role).filter(Role.role_name == "employee").first():
-            employee_role = RBACUtils.create_role(db, "employee", "Regular employee with basic access")
+        if "employee" not in existing_roles:
+            employee_role = Role(role_name="employee", description="Regular employee with basic access")
         
         created_roles = []
         for role in [super_admin_role, admin_role, manager_role, employee_role]:
             if role:
                 created_roles.append(role)
         
+        if not created_roles:
+            return created_roles
+        
+        # Flush once so the new roles get their IDs
+        db.add_all(created_roles)
+        db.flush()
+        
         # Assign permissions to roles
         super_admin_permissions = db.query(Permission).all()  # Super admin gets ALL permissions
         
@@ -476,25 +542,22 @@ class RBACUtils:
             ])
         ).all()
         
-        # Assign permissions to super admin role
-        if super_admin_role:
-            for permission in super_admin_permissions:
-                RBACUtils.assign_permission_to_role(db, super_admin_role.role_id, permission.permission_id)
-        
-        # Assign permissions to admin role
-        if admin_role:
-            for permission in admin_permissions:
-                RBACUtils.assign_permission_to_role(db, admin_role.role_id, permission.permission_id)
-        
-        # Assign permissions to manager role
-        if manager_role:
-            for permission in manager_permissions:
-                RBACUtils.assign_permission_to_role(db, manager_role.role_id, permission.permission_id)
-        
-        # Assign permissions to employee role
-        if employee_role:
-            for permission in employee_permissions:
-                RBACUtils.assign_permission_to_role(db, employee_role.role_id, permission.permission_id)
+        # Assign permissions to the new roles with a single bulk insert
+        role_permission_rows = []
+        for role, permissions in [
+            (super_admin_role, super_admin_permissions),
+            (admin_role, admin_permissions),
+            (manager_role, manager_permissions),
+            (employee_role, employee_permissions),
+        ]:
+            if role:
+                role_permission_rows.extend(
+                    {"role_id": role.role_id, "permission_id": permission.permission_id}
+                    for permission in permissions
+                )
+        if role_permission_rows:
+            db.execute(RolePermission.__table__.insert(), role_permission_rows)
+        db.commit()
         
         return created_roles
 # Ensure admin role has the required employee_access permission
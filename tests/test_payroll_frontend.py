@@ -1,13 +1,8 @@
 import pytest
-import streamlit as st
-from unittest.mock import Mock, patch
-import pandas as pd
-from datetime import date, datetime
-import sys
-import os
-
-# Add the frontend directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'frontend'))
+from unittest.mock import Mock
+from datetime import date
+import re
+import types
 
 from payroll_management_page import (
     api_get, api_post, api_put, api_delete,
@@ -19,19 +14,28 @@ from payroll_management_page import (
     generate_payslip_action, delete_payroll_action,
     payroll_summary_dashboard, employee_payroll_view, main
 )
+import payroll_management_page
 
-# Mock session state for testing
-class MockSessionState:
-    def __init__(self):
-        self.data = {
-            "token": "mock_token",
-            "username": "test_user",
-            "role": "admin",
-            "user_id": 1
-        }
-    
-    def get(self, key, default=None):
-        return self.data.get(key, default)
+# The page's public helpers must all be callable; checked once at import
+assert all(callable(f) for f in (
+    api_get, api_post, api_put, api_delete,
+    has_permission, get_employees, get_departments,
+    get_payroll_history, get_payroll_summary,
+    get_employee_payroll_details, create_payroll,
+    generate_payslip, payroll_generation_form,
+    payroll_history_table, show_payroll_details,
+    generate_payslip_action, delete_payroll_action,
+    payroll_summary_dashboard, employee_payroll_view, main
+)), "payroll_management_page exports must be callable"
+
+# Default mock session state; each test gets its own copy so tests can run
+# in parallel (pytest -n auto) without racing on the role key
+_SESSION = {
+    "token": "mock_token",
+    "username": "test_user",
+    "role": "admin",
+    "user_id": 1
+}
 
 # Test data
 MOCK_EMPLOYEES = [
@@ -86,214 +90,176 @@ MOCK_PAYROLL_SUMMARY = {
     "recent_payrolls": 2
 }
 
-class TestPayrollFrontend:
-    """Test class for payroll frontend functionality"""
+# Timestamp reported by the create/update mocks; no test checks its value
+_FROZEN_NOW = "2023-01-31T10:00:00"
+
+# Cutoff dates shared by the form validation checks
+_CUTOFF_EARLY = date(2023, 1, 1)
+_CUTOFF_LATE = date(2023, 1, 31)
+
+class FakeResp:
+    """Minimal stand-in for ``requests.Response`` used by the API mocks"""
+    __slots__ = ("status_code", "_json", "text")
     
-    @pytest.fixture
-    def mock_session_state(self):
-        """Mock session state for testing"""
-        st.session_state = MockSessionState()
-        return st.session_state
+    def __init__(self, status_code, json_data=None, text=""):
+        self.status_code = status_code
+        self._json = json_data
+        self.text = text
     
-    @pytest.fixture
-    def mock_api_responses(self):
-        """Mock API responses"""
-        with patch('payroll_management_page.api_get') as mock_get, \
-             patch('payroll_management_page.api_post') as mock_post, \
-             patch('payroll_management_page.api_put') as mock_put, \
-             patch('payroll_management_page.api_delete') as mock_delete:
-            
-            # Mock GET responses
-            mock_get.return_value.status_code = 200
-            
-            # Mock employees response
-            def mock_get_employees(endpoint):
-                if endpoint == "/employees/":
-                    MockedResponse = Mock()
-                    MockedResponse.json.return_value = MOCK_EMPLOYEES
-                    MockedResponse.status_code = 200
-                    return MockedResponse
-                elif endpoint == "/departments/":
-                    MockedResponse = Mock()
-                    MockedResponse.json.return_value = MOCK_DEPARTMENTS
-                    MockedResponse.status_code = 200
-                    return MockedResponse
-                elif endpoint == "/payroll/summary":
-                    MockedResponse = Mock()
-                    MockedResponse.json.return_value = MOCK_PAYROLL_SUMMARY
-                    MockedResponse.status_code = 200
-                    return MockedResponse
-                elif "/payroll/employee/" in endpoint:
-                    employee_id = int(endpoint.split("/")[-1])
-                    MockedResponse = Mock()
-                    MockedResponse.json.return_value = [p for p in MOCK_PAYROLL_DATA if p["user_id"] == employee_id]
-                    MockedResponse.status_code = 200
-                    return MockedResponse
-                elif endpoint == "/payroll/filtered":
-                    MockedResponse = Mock()
-                    MockedResponse.json.return_value = MOCK_PAYROLL_DATA
-                    MockedResponse.status_code = 200
-                    return MockedResponse
-                elif "/payroll/" in endpoint and not "/employee/" in endpoint:
-                    payroll_id = int(endpoint.split("/")[-1])
-                    MockedResponse = Mock()
-                    MockedResponse.json.return_value = [p for p in MOCK_PAYROLL_DATA if p["payroll_id"] == payroll_id][0]
-                    MockedResponse.status_code = 200
-                    return MockedResponse
-                else:
-                    MockedResponse = Mock()
-                    MockedResponse.json.return_value = []
-                    MockedResponse.status_code = 404
-                    return MockedResponse
-            
-            mock_get.side_effect = mock_get_employees
-            
-            # Mock POST responses
-            def mock_post_create(endpoint, data):
-                if endpoint == "/payroll/":
-                    MockedResponse = Mock()
-                    MockedResponse.status_code = 201
-                    MockedResponse.json.return_value = {
-                        "payroll_id": 3,
-                        "user_id": data["user_id"],
-                        "cutoff_start": data["cutoff_start"],
-                        "cutoff_end": data["cutoff_end"],
-                        "basic_pay": data["basic_pay"],
-                        "overtime_pay": data["overtime_pay"],
-                        "deductions": data["deductions"],
-                        "net_pay": data["basic_pay"] + data["overtime_pay"] - data["deductions"],
-                        "generated_at": datetime.now().isoformat()
-                    }
-                    return MockedResponse
-                elif "/generate-payslip" in endpoint:
-                    MockedResponse = Mock()
-                    MockedResponse.status_code = 200
-                    MockedResponse.json.return_value = {
-                        "payroll_id": int(endpoint.split("/")[-2]),
-                        "message": "Payslip generated successfully",
-                        "status": "success"
-                    }
-                    return MockedResponse
-                else:
-                    MockedResponse = Mock()
-                    MockedResponse.status_code = 400
-                    MockedResponse.text = "Bad request"
-                    return MockedResponse
-            
-            mock_post.side_effect = mock_post_create
-            
-            # Mock PUT responses
-            def mock_put_update(endpoint, data):
-                if "/payroll/" in endpoint:
-                    MockedResponse = Mock()
-                    MockedResponse.status_code = 200
-                    MockedResponse.json.return_value = {
-                        "payroll_id": int(endpoint.split("/")[-1]),
-                        "user_id": 1,
-                        "cutoff_start": "2023-01-01",
-                        "cutoff_end": "2023-01-31",
-                        "basic_pay": 3000.00,
-                        "overtime_pay": 500.00,
-                        "deductions": 200.00,
-                        "net_pay": 3300.00,
-                        "generated_at": datetime.now().isoformat()
-                    }
-                    return MockedResponse
-                else:
-                    MockedResponse = Mock()
-                    MockedResponse.status_code = 404
-                    MockedResponse.text = "Not found"
-                    return MockedResponse
-            
-            mock_put.side_effect = mock_put_update
-            
-            # Mock DELETE responses
-            def mock_delete(endpoint):
-                if "/payroll/" in endpoint:
-                    MockedResponse = Mock()
-                    MockedResponse.status_code = 204
-                    return MockedResponse
-                else:
-                    MockedResponse = Mock()
-                    MockedResponse.status_code = 404
-                    return MockedResponse
-            
-            mock_delete.side_effect = mock_delete
-            
-            yield mock_get, mock_post, mock_put, mock_delete
+    def json(self):
+        return self._json
+
+# Responses that never change between tests, keyed by endpoint
+STATIC_GET_RESPONSES = {
+    "/employees/": FakeResp(200, MOCK_EMPLOYEES),
+    "/departments/": FakeResp(200, MOCK_DEPARTMENTS),
+    "/payroll/summary": FakeResp(200, MOCK_PAYROLL_SUMMARY),
+    "/payroll/filtered": FakeResp(200, MOCK_PAYROLL_DATA)
+}
+
+EMPLOYEE_PAYROLL_RE = re.compile(r"^/payroll/employee/(\d+)$")
+PAYROLL_ID_RE = re.compile(r"^/payroll/(\d+)$")
+
+# Payroll records indexed by employee and by payroll ID. Tests never mutate
+# payroll data, so the buckets are frozen and returned as-is.
+PAYROLL_BY_USER = {}
+PAYROLL_BY_ID = {}
+for _payroll in MOCK_PAYROLL_DATA:
+    PAYROLL_BY_USER.setdefault(_payroll["user_id"], []).append(_payroll)
+    PAYROLL_BY_ID[_payroll["payroll_id"]] = _payroll
+PAYROLL_BY_USER = {user_id: tuple(records) for user_id, records in PAYROLL_BY_USER.items()}
+
+# Mock GET responses
+def mock_get_employees(endpoint):
+    response = STATIC_GET_RESPONSES.get(endpoint)
+    if response is not None:
+        return response
+    match = EMPLOYEE_PAYROLL_RE.match(endpoint)
+    if match:
+        return FakeResp(200, PAYROLL_BY_USER.get(int(match.group(1)), ()))
+    match = PAYROLL_ID_RE.match(endpoint)
+    if match and int(match.group(1)) in PAYROLL_BY_ID:
+        return FakeResp(200, PAYROLL_BY_ID[int(match.group(1))])
+    return FakeResp(404, [])
+
+# Mock POST responses
+def mock_post_create(endpoint, data):
+    if endpoint == "/payroll/":
+        return FakeResp(201, {
+            "payroll_id": 3,
+            "user_id": data["user_id"],
+            "cutoff_start": data["cutoff_start"],
+            "cutoff_end": data["cutoff_end"],
+            "basic_pay": data["basic_pay"],
+            "overtime_pay": data["overtime_pay"],
+            "deductions": data["deductions"],
+            "net_pay": data["basic_pay"] + data["overtime_pay"] - data["deductions"],
+            "generated_at": _FROZEN_NOW
+        })
+    elif "/generate-payslip" in endpoint:
+        return FakeResp(200, {
+            "payroll_id": int(endpoint.split("/")[-2]),
+            "message": "Payslip generated successfully",
+            "status": "success"
+        })
+    else:
+        return FakeResp(400, text="Bad request")
+
+# Mock PUT responses
+def mock_put_update(endpoint, data):
+    if "/payroll/" in endpoint:
+        return FakeResp(200, {
+            "payroll_id": int(endpoint.split("/")[-1]),
+            "user_id": 1,
+            "cutoff_start": "2023-01-01",
+            "cutoff_end": "2023-01-31",
+            "basic_pay": 3000.00,
+            "overtime_pay": 500.00,
+            "deductions": 200.00,
+            "net_pay": 3300.00,
+            "generated_at": _FROZEN_NOW
+        })
+    else:
+        return FakeResp(404, text="Not found")
+
+# Mock DELETE responses
+def mock_delete_payroll(endpoint):
+    if "/payroll/" in endpoint:
+        return FakeResp(204)
+    else:
+        return FakeResp(404)
+
+@pytest.fixture(scope="session")
+def api_mocks():
+    """Build the API mocks once per test session"""
+    return {
+        "api_get": Mock(side_effect=mock_get_employees),
+        "api_post": Mock(side_effect=mock_post_create),
+        "api_put": Mock(side_effect=mock_put_update),
+        "api_delete": Mock(side_effect=mock_delete_payroll)
+    }
+
+@pytest.fixture
+def frontend_env(monkeypatch, api_mocks):
+    """Patch the page's API helpers and session state in one setup pass"""
+    for name, mock in api_mocks.items():
+        # The mocks are shared across the session; start each test with a
+        # clean call history so call assertions don't depend on test order
+        mock.reset_mock()
+        monkeypatch.setattr(payroll_management_page, name, mock)
+    # has_permission only reads st.session_state, so a namespace stands in
+    # for the streamlit module
+    session_state = dict(_SESSION)
+    monkeypatch.setattr(payroll_management_page, "st", types.SimpleNamespace(session_state=session_state))
+    return types.SimpleNamespace(
+        mock_get=api_mocks["api_get"],
+        mock_post=api_mocks["api_post"],
+        mock_put=api_mocks["api_put"],
+        mock_delete=api_mocks["api_delete"],
+        session=session_state
+    )
+
+class TestPayrollFrontend:
+    """Test class for payroll frontend functionality"""
     
-    def test_has_permission(self, mock_session_state):
+    @pytest.mark.parametrize("current_role,check_role,expected", [
+        ("admin", "admin", True),
+        ("admin", "manager", False),
+        ("admin", "employee", False),
+        ("manager", "admin", False),
+        ("manager", "manager", True),
+        ("manager", "employee", False),
+        ("employee", "admin", False),
+        ("employee", "manager", False),
+        ("employee", "employee", True),
+        ("invalid", "admin", False),
+        ("invalid", "manager", False),
+        ("invalid", "employee", False)
+    ])
+    def test_has_permission(self, frontend_env, current_role, check_role, expected):
         """Test permission checking"""
-        # Test admin role
-        st.session_state.data["role"] = "admin"
-        assert has_permission("admin") == True
-        assert has_permission("manager") == False
-        assert has_permission("employee") == False
-        
-        # Test manager role
-        st.session_state.data["role"] = "manager"
-        assert has_permission("admin") == False
-        assert has_permission("manager") == True
-        assert has_permission("employee") == False
-        
-        # Test employee role
-        st.session_state.data["role"] = "employee"
-        assert has_permission("admin") == False
-        assert has_permission("manager") == False
-        assert has_permission("employee") == True
-        
-        # Test invalid role
-        st.session_state.data["role"] = "invalid"
-        assert has_permission("admin") == False
-        assert has_permission("manager") == False
-        assert has_permission("employee") == False
-    
-    def test_get_employees(self, mock_api_responses):
-        """Test getting employees"""
-        mock_get, _, _, _ = mock_api_responses
-        employees = get_employees()
-        assert employees == MOCK_EMPLOYEES
-        assert len(employees) == 2
-        assert employees[0]["user_id"] == 1
-        assert employees[1]["user_id"] == 2
-    
-    def test_get_departments(self, mock_api_responses):
-        """Test getting departments"""
-        mock_get, _, _, _ = mock_api_responses
-        departments = get_departments()
-        assert departments == MOCK_DEPARTMENTS
-        assert len(departments) == 2
-        assert departments[0]["department_id"] == 1
-        assert departments[1]["department_id"] == 2
-    
-    def test_get_payroll_history(self, mock_api_responses):
-        """Test getting payroll history"""
-        mock_get, _, _, _ = mock_api_responses
-        payroll_data = get_payroll_history()
-        assert payroll_data == MOCK_PAYROLL_DATA
-        assert len(payroll_data) == 2
+        frontend_env.session["role"] = current_role
+        assert has_permission(check_role) is expected
     
-    def test_get_payroll_summary(self, mock_api_responses):
-        """Test getting payroll summary"""
-        mock_get, _, _, _ = mock_api_responses
-        summary = get_payroll_summary()
-        assert summary == MOCK_PAYROLL_SUMMARY
-        assert summary["total_payrolls"] == 2
-        assert summary["total_net_pay"] == 6850.00
-        assert summary["average_net_pay"] == 3425.00
-        assert summary["recent_payrolls"] == 2
+    @pytest.mark.parametrize("func,expected", [
+        (get_employees, MOCK_EMPLOYEES),
+        (get_departments, MOCK_DEPARTMENTS),
+        (get_payroll_history, MOCK_PAYROLL_DATA),
+        (get_payroll_summary, MOCK_PAYROLL_SUMMARY)
+    ], ids=["employees", "departments", "payroll_history", "payroll_summary"])
+    def test_api_wrapper(self, frontend_env, func, expected):
+        """Test the API wrappers that return a dataset unchanged"""
+        assert func() == expected
     
-    def test_get_employee_payroll_details(self, mock_api_responses):
+    def test_get_employee_payroll_details(self, frontend_env):
         """Test getting employee payroll details"""
-        mock_get, _, _, _ = mock_api_responses
         details = get_employee_payroll_details(1)
         assert len(details) == 1
         assert details[0]["user_id"] == 1
         assert details[0]["payroll_id"] == 1
     
-    def test_create_payroll(self, mock_api_responses):
+    def test_create_payroll(self, frontend_env):
         """Test creating payroll"""
-        _, mock_post, _, _ = mock_api_responses
         payroll_data = {
             "user_id": 1,
             "cutoff_start": "2023-01-01",
@@ -308,19 +274,18 @@ class TestPayrollFrontend:
         assert result["data"]["user_id"] == 1
         assert result["data"]["net_pay"] == 3300.00
     
-    def test_generate_payslip(self, mock_api_responses):
+    def test_generate_payslip(self, frontend_env):
         """Test generating payslip"""
-        _, mock_post, _, _ = mock_api_responses
         result = generate_payslip(1)
         assert result["success"] == True
         assert result["data"]["payroll_id"] == 1
         assert result["data"]["status"] == "success"
     
-    def test_payroll_generation_form_validation(self, mock_session_state):
+    def test_payroll_generation_form_validation(self, frontend_env):
         """Test payroll generation form validation"""
         # Test cutoff date validation
-        cutoff_start = date(2023, 1, 31)
-        cutoff_end = date(2023, 1, 1)  # End before start
+        cutoff_start = _CUTOFF_LATE
+        cutoff_end = _CUTOFF_EARLY  # End before start
         
         form_errors = []
         if cutoff_start >= cutoff_end:
@@ -347,77 +312,28 @@ class TestPayrollFrontend:
         assert "Overtime pay cannot be negative" in form_errors[1]
         assert "Deductions cannot be negative" in form_errors[2]
     
-    def test_payroll_history_table_permissions(self, mock_session_state):
-        """Test payroll history table permissions"""
-        # Test without permission
-        st.session_state.data["role"] = "guest"
-        # This would normally show an error message in the UI
-        # We can't easily test the UI behavior here, but we can test the function logic
-        
-        # Test with admin permission
-        st.session_state.data["role"] = "admin"
-        assert has_permission("admin") == True
-        
-        # Test with manager permission
-        st.session_state.data["role"] = "manager"
-        assert has_permission("manager") == True
-        
-        # Test with employee permission
-        st.session_state.data["role"] = "employee"
-        assert has_permission("employee") == True
-    
-    def test_delete_payroll_action(self, mock_api_responses):
+    def test_delete_payroll_action(self, frontend_env):
         """Test delete payroll action"""
-        _, _, _, mock_delete = mock_api_responses
         # This would normally show a confirmation dialog in the UI
         # We can't easily test the UI behavior here, but we can test the API call
         
         # The actual delete action is triggered by the UI, but we can test the API call
         # This is a simplified test of the API call
-        response = api_delete("/payroll/1")
+        response = payroll_management_page.api_delete("/payroll/1")
         assert response.status_code == 204
     
-    def test_show_payroll_details(self, mock_api_responses):
+    def test_show_payroll_details(self, frontend_env):
         """Test showing payroll details"""
-        mock_get, _, _, _ = mock_api_responses
         # This would normally show details in the UI
         # We can't easily test the UI behavior here, but we can test the API call
         
         # The actual show details action is triggered by the UI, but we can test the API call
-        response = api_get("/payroll/1")
+        response = payroll_management_page.api_get("/payroll/1")
         assert response.status_code == 200
         data = response.json()
         assert data["payroll_id"] == 1
         assert data["user_id"] == 1
         assert data["net_pay"] == 3300.00
 
-def test_payroll_frontend_integration():
-    """Integration test for payroll frontend functionality"""
-    # This would be more comprehensive integration testing
-    # For now, we'll just test that the main function can be called
-    # without errors (though it won't run without a Streamlit context)
-    
-    # Test that the functions exist and are callable
-    assert callable(api_get)
-    assert callable(api_post)
-    assert callable(api_put)
-    assert callable(api_delete)
-    assert callable(has_permission)
-    assert callable(get_employees)
-    assert callable(get_departments)
-    assert callable(get_payroll_history)
-    assert callable(get_payroll_summary)
-    assert callable(get_employee_payroll_details)
-    assert callable(create_payroll)
-    assert callable(generate_payslip)
-    assert callable(payroll_generation_form)
-    assert callable(payroll_history_table)
-    assert callable(show_payroll_details)
-    assert callable(generate_payslip_action)
-    assert callable(delete_payroll_action)
-    assert callable(payroll_summary_dashboard)
-    assert callable(employee_payroll_view)
-    assert callable(main)
-
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
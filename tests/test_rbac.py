@@ -7,51 +7,113 @@ and permission validation.
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import date
+from collections import namedtuple
+from types import SimpleNamespace
+import json
 import os
-import sys
-
-# Add the backend directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from backend.main import app
 from backend.database import get_db
 from backend.models import Base, User, Role, Permission, RolePermission
 from backend.utils.rbac import RBACUtils
 
-# Create a test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_rbac.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create an in-memory test database; StaticPool keeps a single connection so
+# every session sees the same database. The database is named after the
+# xdist worker so parallel runs (pytest -n auto --dist=loadgroup) never share it.
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "master")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///file:rbac_{XDIST_WORKER}?mode=memory&cache=shared&uri=true"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy
+    # emit BEGIN instead
+    dbapi_connection.isolation_level = None
 
-app.dependency_overrides[get_db] = override_get_db
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
-client = TestClient(app)
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Durability buys nothing in tests; skip fsyncs and keep temp data in memory
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
 
-@pytest.fixture(scope="function")
-def test_db():
-    # Create the tables
+
+# The tests share seeded session-scoped state, so keep them on one worker
+pytestmark = pytest.mark.xdist_group("rbac")
+
+# A CRUD resource exercised by TestRBACCrud: URL path, name/ID keys in the API
+# payload, a human-readable label and the RBACUtils factory that creates one
+Resource = namedtuple("Resource", ["path", "name_key", "id_key", "label", "create"])
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Share one TestClient across the session. The client is not entered as a
+    context manager: the app's lifespan seeds the application database, not
+    the test engine.
+    """
+    return TestClient(app)
+
+@pytest.fixture(scope="session")
+def rbac_schema():
+    """Create the tables and seed the RBAC data once per test session."""
     Base.metadata.create_all(bind=engine)
     
-    # Seed the RBAC data
     db = TestingSessionLocal()
     try:
         RBACUtils.seed_default_permissions(db)
         RBACUtils.seed_default_roles(db)
+    finally:
+        db.close()
+    
+    yield engine
+    
+    # Each test rolls its own work back (see test_db), so there is nothing to
+    # drop; closing the only connection discards the in-memory database
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def test_db(rbac_schema):
+    """
+    Yield a session wrapped in an outer transaction that is rolled back after
+    the test. Commits made by the test or by the API only release a SAVEPOINT,
+    which is restarted straight away.
+    """
+    connection = rbac_schema.connect()
+    transaction = connection.begin()
+    db = TestingSessionLocal(bind=connection)
+    db.begin_nested()
+    
+    @event.listens_for(db, "after_transaction_end")
+    def restart_savepoint(session, trans):
+        if trans.nested and not trans._parent.nested:
+            session.begin_nested()
+    
+    # The API must see the same uncommitted data as the test
+    app.dependency_overrides[get_db] = lambda: db
+    try:
         yield db
     finally:
+        app.dependency_overrides.pop(get_db, None)
         db.close()
-        # Drop the tables
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 @pytest.fixture
 def test_user(test_db):
@@ -69,7 +131,6 @@ def test_user(test_db):
     )
     test_db.add(user)
     test_db.commit()
-    test_db.refresh(user)
     return user
 
 @pytest.fixture
@@ -88,181 +149,119 @@ def test_admin(test_db):
     )
     test_db.add(admin)
     test_db.commit()
-    test_db.refresh(admin)
     return admin
 
-class TestRBACPermissions:
-    """Test permission CRUD operations."""
-    
-    def test_create_permission(self, test_db):
-        """Test creating a permission."""
-        permission_data = {
-            "permission_name": "test_permission",
-            "description": "Test permission description"
-        }
-        
-        response = client.post("/permissions/", json=permission_data)
-        assert response.status_code == 201
-        
-        data = response.json()
-        assert data["permission_name"] == "test_permission"
-        assert data["description"] == "Test permission description"
-    
-    def test_create_permission_duplicate(self, test_db):
-        """Test creating a duplicate permission."""
-        # Create a permission first
-        permission = RBACUtils.create_permission(test_db, "test_permission", "Test description")
-        
-        # Try to create the same permission again
-        permission_data = {
-            "permission_name": "test_permission",
-            "description": "Test permission description"
-        }
-        
-        response = client.post("/permissions/", json=permission_data)
-        assert response.status_code == 400
-    
-    def test_get_permissions(self, test_db):
-        """Test getting all permissions."""
-        # Create some permissions
-        RBACUtils.create_permission(test_db, "perm1", "Permission 1")
-        RBACUtils.create_permission(test_db, "perm2", "Permission 2")
-        
-        response = client.get("/permissions/")
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert len(data) >= 2
-        assert any(p["permission_name"] == "perm1" for p in data)
-        assert any(p["permission_name"] == "perm2" for p in data)
-    
-    def test_get_permission_by_id(self, test_db):
-        """Test getting a permission by ID."""
-        permission = RBACUtils.create_permission(test_db, "test_permission", "Test description")
-        
-        response = client.get(f"/permissions/{permission.permission_id}")
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert data["permission_id"] == permission.permission_id
-        assert data["permission_name"] == "test_permission"
-    
-    def test_get_permission_not_found(self, test_db):
-        """Test getting a non-existent permission."""
-        response = client.get("/permissions/999")
-        assert response.status_code == 404
-    
-    def test_update_permission(self, test_db):
-        """Test updating a permission."""
-        permission = RBACUtils.create_permission(test_db, "test_permission", "Test description")
-        
-        update_data = {
-            "permission_name": "updated_permission",
-            "description": "Updated description"
-        }
-        
-        response = client.put(f"/permissions/{permission.permission_id}", json=update_data)
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert data["permission_name"] == "updated_permission"
-        assert data["description"] == "Updated description"
-    
-    def test_delete_permission(self, test_db):
-        """Test deleting a permission."""
-        permission = RBACUtils.create_permission(test_db, "test_permission", "Test description")
-        
-        response = client.delete(f"/permissions/{permission.permission_id}")
-        assert response.status_code == 204
-        
-        # Verify the permission is deleted
-        response = client.get(f"/permissions/{permission.permission_id}")
-        assert response.status_code == 404
+RESOURCES = (
+    Resource("permissions", "permission_name", "permission_id", "permission", RBACUtils.create_permission),
+    Resource("roles", "role_name", "role_id", "role", RBACUtils.create_role)
+)
 
-class TestRBACRoles:
-    """Test role CRUD operations."""
-    
-    def test_create_role(self, test_db):
-        """Test creating a role."""
-        role_data = {
-            "role_name": "test_role",
-            "description": "Test role description"
-        }
-        
-        response = client.post("/roles/", json=role_data)
+# Request bodies are identical across runs, so serialize them once and send
+# the bytes as-is
+_JSON_HEADERS = {"content-type": "application/json"}
+_CREATE_PAYLOADS = {
+    r.label: json.dumps({
+        r.name_key: f"test_{r.label}",
+        "description": f"Test {r.label} description"
+    }).encode()
+    for r in RESOURCES
+}
+_UPDATE_PAYLOADS = {
+    r.label: json.dumps({
+        r.name_key: f"updated_{r.label}",
+        "description": "Updated description"
+    }).encode()
+    for r in RESOURCES
+}
+
+@pytest.fixture(params=RESOURCES, ids=["permissions", "roles"])
+def resource(request):
+    """The CRUD resource under test."""
+    return request.param
+
+class TestRBACCrud:
+    """Test permission and role CRUD operations."""
+    
+    def test_create(self, test_db, resource, client):
+        """Test creating a permission or role."""
+        response = client.post(
+            f"/{resource.path}/", content=_CREATE_PAYLOADS[resource.label], headers=_JSON_HEADERS
+        )
         assert response.status_code == 201
         
         data = response.json()
-        assert data["role_name"] == "test_role"
-        assert data["description"] == "Test role description"
+        assert data[resource.name_key] == f"test_{resource.label}"
+        assert data["description"] == f"Test {resource.label} description"
     
-    def test_create_role_duplicate(self, test_db):
-        """Test creating a duplicate role."""
-        # Create a role first
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
-        
-        # Try to create the same role again
-        role_data = {
-            "role_name": "test_role",
-            "description": "Test role description"
-        }
-        
-        response = client.post("/roles/", json=role_data)
+    def test_create_duplicate(self, test_db, resource, client):
+        """Test creating a duplicate permission or role."""
+        # Create the resource first
+        resource.create(test_db, f"test_{resource.label}", "Test description")
+        
+        # Try to create the same resource again
+        response = client.post(
+            f"/{resource.path}/", content=_CREATE_PAYLOADS[resource.label], headers=_JSON_HEADERS
+        )
         assert response.status_code == 400
     
-    def test_get_roles(self, test_db):
-        """Test getting all roles."""
-        # Create some roles
-        RBACUtils.create_role(test_db, "role1", "Role 1")
-        RBACUtils.create_role(test_db, "role2", "Role 2")
+    def test_list(self, test_db, resource, client):
+        """Test getting all permissions or roles."""
+        resource.create(test_db, f"{resource.label}1", f"{resource.label.title()} 1")
+        resource.create(test_db, f"{resource.label}2", f"{resource.label.title()} 2")
         
-        response = client.get("/roles/")
+        response = client.get(f"/{resource.path}/")
         assert response.status_code == 200
         
         data = response.json()
         assert len(data) >= 2
-        assert any(r["role_name"] == "role1" for r in data)
-        assert any(r["role_name"] == "role2" for r in data)
+        names = {item[resource.name_key] for item in data}
+        assert {f"{resource.label}1", f"{resource.label}2"} <= names
     
-    def test_get_role_by_id(self, test_db):
-        """Test getting a role by ID."""
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
+    def test_get_by_id(self, test_db, resource, client):
+        """Test getting a permission or role by ID."""
+        created = resource.create(test_db, f"test_{resource.label}", "Test description")
+        created_id = getattr(created, resource.id_key)
         
-        response = client.get(f"/roles/{role.role_id}")
+        response = client.get(f"/{resource.path}/{created_id}")
         assert response.status_code == 200
         
         data = response.json()
-        assert data["role_id"] == role.role_id
-        assert data["role_name"] == "test_role"
+        assert data[resource.id_key] == created_id
+        assert data[resource.name_key] == f"test_{resource.label}"
     
-    def test_update_role(self, test_db):
-        """Test updating a role."""
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
-        
-        update_data = {
-            "role_name": "updated_role",
-            "description": "Updated description"
-        }
-        
-        response = client.put(f"/roles/{role.role_id}", json=update_data)
+    def test_get_not_found(self, test_db, resource, client):
+        """Test getting a non-existent permission or role."""
+        response = client.get(f"/{resource.path}/999")
+        assert response.status_code == 404
+    
+    def test_update(self, test_db, resource, client):
+        """Test updating a permission or role."""
+        created = resource.create(test_db, f"test_{resource.label}", "Test description")
+        
+        response = client.put(
+            f"/{resource.path}/{getattr(created, resource.id_key)}",
+            content=_UPDATE_PAYLOADS[resource.label],
+            headers=_JSON_HEADERS
+        )
         assert response.status_code == 200
         
         data = response.json()
-        assert data["role_name"] == "updated_role"
+        assert data[resource.name_key] == f"updated_{resource.label}"
         assert data["description"] == "Updated description"
     
-    def test_delete_role(self, test_db):
-        """Test deleting a role."""
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
+    def test_delete(self, test_db, resource, client):
+        """Test deleting a permission or role."""
+        created = resource.create(test_db, f"test_{resource.label}", "Test description")
+        url = f"/{resource.path}/{getattr(created, resource.id_key)}"
         
-        response = client.delete(f"/roles/{role.role_id}")
+        response = client.delete(url)
         assert response.status_code == 204
         
-        # Verify the role is deleted
-        response = client.get(f"/roles/{role.role_id}")
+        # Verify the resource is deleted
+        response = client.get(url)
         assert response.status_code == 404
     
-    def test_delete_role_with_users(self, test_db, test_user):
+    def test_delete_role_with_users(self, test_db, test_user, client):
         """Test deleting a role that has users assigned."""
         # Create a role
         role = RBACUtils.create_role(test_db, "test_role", "Test description")
@@ -278,7 +277,7 @@ class TestRBACRoles:
 class TestRBACRolePermissions:
     """Test role-permission assignment operations."""
     
-    def test_assign_permissions_to_role(self, test_db):
+    def test_assign_permissions_to_role(self, test_db, client):
         """Test assigning permissions to a role."""
         # Create a role
         role = RBACUtils.create_role(test_db, "test_role", "Test description")
@@ -299,7 +298,7 @@ class TestRBACRolePermissions:
         assert "Successfully assigned" in data["message"]
         assert data["message"].endswith("permissions to role test_role")
     
-    def test_assign_permissions_to_nonexistent_role(self, test_db):
+    def test_assign_permissions_to_nonexistent_role(self, test_db, client):
         """Test assigning permissions to a non-existent role."""
         # Create a permission
         perm = RBACUtils.create_permission(test_db, "perm1", "Permission 1")
@@ -311,7 +310,7 @@ class TestRBACRolePermissions:
         response = client.post("/roles/999/permissions", json=assignment_data)
         assert response.status_code == 404
     
-    def test_assign_nonexistent_permissions(self, test_db):
+    def test_assign_nonexistent_permissions(self, test_db, client):
         """Test assigning non-existent permissions to a role."""
         # Create a role
         role = RBACUtils.create_role(test_db, "test_role", "Test description")
@@ -323,7 +322,7 @@ class TestRBACRolePermissions:
         response = client.post(f"/roles/{role.role_id}/permissions", json=assignment_data)
         assert response.status_code == 404
     
-    def test_remove_permission_from_role(self, test_db):
+    def test_remove_permission_from_role(self, test_db, client):
         """Test removing a permission from a role."""
         # Create a role
         role = RBACUtils.create_role(test_db, "test_role", "Test description")
@@ -344,7 +343,7 @@ class TestRBACRolePermissions:
         ).all()
         assert len(role_permissions) == 0
     
-    def test_remove_nonexistent_permission(self, test_db):
+    def test_remove_nonexistent_permission(self, test_db, client):
         """Test removing a non-existent permission from a role."""
         # Create a role
         role = RBACUtils.create_role(test_db, "test_role", "Test description")
@@ -352,7 +351,7 @@ class TestRBACRolePermissions:
         response = client.delete(f"/roles/{role.role_id}/permissions/999")
         assert response.status_code == 404
     
-    def test_remove_permission_from_nonexistent_role(self, test_db):
+    def test_remove_permission_from_nonexistent_role(self, test_db, client):
         """Test removing a permission from a non-existent role."""
         # Create a permission
         perm = RBACUtils.create_permission(test_db, "perm1", "Permission 1")
@@ -360,7 +359,7 @@ class TestRBACRolePermissions:
         response = client.delete("/roles/999/permissions/1")
         assert response.status_code == 404
     
-    def test_get_role_permissions(self, test_db):
+    def test_get_role_permissions(self, test_db, client):
         """Test getting permissions for a role."""
         # Create a role
         role = RBACUtils.create_role(test_db, "test_role", "Test description")
@@ -370,149 +369,149 @@ class TestRBACRolePermissions:
         perm2 = RBACUtils.create_permission(test_db, "perm2", "Permission 2")
         
         # Assign permissions to the role
-        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm1.permission_id)
-        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm2.permission_id)
+        RBACUtils.bulk_assign_permissions(test_db, role.role_id, [perm1.permission_id, perm2.permission_id])
         
         response = client.get(f"/roles/{role.role_id}/permissions")
         assert response.status_code == 200
         
         data = response.json()
         assert len(data) == 2
-        assert any(p["permission_name"] == "perm1" for p in data)
-        assert any(p["permission_name"] == "perm2" for p in data)
+        assert {"perm1", "perm2"} <= {p["permission_name"] for p in data}
+
+@pytest.fixture
+def rbac_user(test_db):
+    """Create a role with two permissions and a user assigned to that role."""
+    # Create a role
+    role = RBACUtils.create_role(test_db, "test_role", "Test description")
+    
+    # Create some permissions
+    perm1 = RBACUtils.create_permission(test_db, "perm1", "Permission 1")
+    perm2 = RBACUtils.create_permission(test_db, "perm2", "Permission 2")
+    
+    # Assign permissions to role
+    RBACUtils.bulk_assign_permissions(test_db, role.role_id, [perm1.permission_id, perm2.permission_id])
+    
+    # Create a user with this role
+    user = User(
+        username="testuser",
+        password_hash="hashedpassword",
+        role_name="test_role",
+        first_name="Test",
+        last_name="User",
+        email="test@example.com",
+        hourly_rate=15.00,
+        date_hired=date(2023, 1, 1),
+        status="active",
+        role_id=role.role_id
+    )
+    test_db.add(user)
+    test_db.commit()
+    
+    return SimpleNamespace(user=user, role=role, perms=[perm1, perm2])
 
 class TestRBACUtils:
     """Test RBAC utility functions."""
     
-    def test_user_has_permission(self, test_db):
+    def test_user_has_permission(self, test_db, rbac_user):
         """Test checking if a user has a permission."""
-        # Create a role
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
-        
-        # Create a permission
-        perm = RBACUtils.create_permission(test_db, "perm1", "Permission 1")
-        
-        # Assign permission to role
-        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm.permission_id)
-        
-        # Create a user with this role
-        user = User(
-            username="testuser",
-            password_hash="hashedpassword",
-            role_name="test_role",
-            first_name="Test",
-            last_name="User",
-            email="test@example.com",
-            hourly_rate=15.00,
-            date_hired=date(2023, 1, 1),
-            status="active",
-            role_id=role.role_id
-        )
-        test_db.add(user)
-        test_db.commit()
-        
         # Test user has permission
-        assert RBACUtils.user_has_permission(user, "perm1", test_db) is True
+        assert RBACUtils.user_has_permission(rbac_user.user, "perm1", test_db) is True
         
         # Test user doesn't have permission
-        assert RBACUtils.user_has_permission(user, "nonexistent", test_db) is False
+        assert RBACUtils.user_has_permission(rbac_user.user, "nonexistent", test_db) is False
     
-    def test_user_has_role(self, test_db):
+    def test_user_has_role(self, rbac_user):
         """Test checking if a user has a role."""
-        # Create a role
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
-        
-        # Create a user with this role
-        user = User(
-            username="testuser",
-            password_hash="hashedpassword",
-            role_name="test_role",
-            first_name="Test",
-            last_name="User",
-            email="test@example.com",
-            hourly_rate=15.00,
-            date_hired=date(2023, 1, 1),
-            status="active",
-            role_id=role.role_id
-        )
-        test_db.add(user)
-        test_db.commit()
-        
         # Test user has role
-        assert RBACUtils.user_has_role(user, "test_role") is True
+        assert RBACUtils.user_has_role(rbac_user.user, "test_role") is True
         
         # Test user doesn't have role
-        assert RBACUtils.user_has_role(user, "nonexistent") is False
+        assert RBACUtils.user_has_role(rbac_user.user, "nonexistent") is False
     
-    def test_get_user_permissions(self, test_db):
+    def test_get_user_permissions(self, test_db, rbac_user):
         """Test getting user permissions."""
-        # Create a role
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
-        
-        # Create some permissions
-        perm1 = RBACUtils.create_permission(test_db, "perm1", "Permission 1")
-        perm2 = RBACUtils.create_permission(test_db, "perm2", "Permission 2")
-        
-        # Assign permissions to role
-        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm1.permission_id)
-        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm2.permission_id)
-        
-        # Create a user with this role
-        user = User(
-            username="testuser",
-            password_hash="hashedpassword",
-            role_name="test_role",
-            first_name="Test",
-            last_name="User",
-            email="test@example.com",
-            hourly_rate=15.00,
-            date_hired=date(2023, 1, 1),
-            status="active",
-            role_id=role.role_id
-        )
-        test_db.add(user)
-        test_db.commit()
-        
-        # Test getting user permissions
-        permissions = RBACUtils.get_user_permissions(user, test_db)
+        permissions = RBACUtils.get_user_permissions(rbac_user.user, test_db)
         assert len(permissions) == 2
-        assert any(p.permission_name == "perm1" for p in permissions)
-        assert any(p.permission_name == "perm2" for p in permissions)
+        assert {"perm1", "perm2"} <= {p.permission_name for p in permissions}
     
-    def test_get_user_permission_names(self, test_db):
+    def test_get_user_permission_names(self, test_db, rbac_user):
         """Test getting user permission names."""
-        # Create a role
-        role = RBACUtils.create_role(test_db, "test_role", "Test description")
+        permission_names = RBACUtils.get_user_permission_names(rbac_user.user, test_db)
+        assert len(permission_names) == 2
+        assert {"perm1", "perm2"} <= set(permission_names)
+
+class TestRBACPermissionCache:
+    """Test the per-session cache behind RBACUtils.get_user_permissions."""
+    
+    @pytest.fixture
+    def cached_role(self, test_db):
+        """A role with one permission and an unsaved user assigned to it."""
+        role = RBACUtils.create_role(test_db, "cache_role", "Cache test role")
+        perm1 = RBACUtils.create_permission(test_db, "cache_perm1", "Permission 1")
+        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm1.permission_id)
+        # get_user_permissions only reads role_id, so the user need not be saved
+        user = User(username="cacheuser", role_name="cache_role", role_id=role.role_id)
+        return SimpleNamespace(role=role, perm1=perm1, user=user)
+    
+    @staticmethod
+    def _names(user, db):
+        return {p.permission_name for p in RBACUtils.get_user_permissions(user, db)}
+    
+    def test_cache_hit(self, test_db, cached_role):
+        """Test repeated calls in one session reuse the cached result."""
+        first = RBACUtils.get_user_permissions(cached_role.user, test_db)
+        assert RBACUtils.get_user_permissions(cached_role.user, test_db) is first
+    
+    def test_cache_miss_for_other_session(self, test_db, cached_role):
+        """Test a different session never receives the cached rows."""
+        first = RBACUtils.get_user_permissions(cached_role.user, test_db)
+        other_db = TestingSessionLocal(bind=test_db.connection())
+        try:
+            second = RBACUtils.get_user_permissions(cached_role.user, other_db)
+            assert second is not first
+            assert {p.permission_name for p in second} == {"cache_perm1"}
+        finally:
+            other_db.close()
+    
+    def test_invalidated_by_permission_changes(self, test_db, cached_role):
+        """Test assigning or removing role permissions refreshes the cache."""
+        user = cached_role.user
+        assert self._names(user, test_db) == {"cache_perm1"}
         
-        # Create some permissions
-        perm1 = RBACUtils.create_permission(test_db, "perm1", "Permission 1")
-        perm2 = RBACUtils.create_permission(test_db, "perm2", "Permission 2")
+        perm2 = RBACUtils.create_permission(test_db, "cache_perm2", "Permission 2")
+        RBACUtils.assign_permission_to_role(test_db, cached_role.role.role_id, perm2.permission_id)
+        assert self._names(user, test_db) == {"cache_perm1", "cache_perm2"}
         
-        # Assign permissions to role
-        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm1.permission_id)
-        RBACUtils.assign_permission_to_role(test_db, role.role_id, perm2.permission_id)
-        
-        # Create a user with this role
-        user = User(
-            username="testuser",
-            password_hash="hashedpassword",
-            role_name="test_role",
-            first_name="Test",
-            last_name="User",
-            email="test@example.com",
-            hourly_rate=15.00,
-            date_hired=date(2023, 1, 1),
-            status="active",
-            role_id=role.role_id
-        )
-        test_db.add(user)
-        test_db.commit()
+        RBACUtils.remove_permission_from_role(test_db, cached_role.role.role_id, cached_role.perm1.permission_id)
+        assert self._names(user, test_db) == {"cache_perm2"}
         
-        # Test getting user permission names
-        permission_names = RBACUtils.get_user_permission_names(user, test_db)
-        assert len(permission_names) == 2
-        assert "perm1" in permission_names
-        assert "perm2" in permission_names
+        perm3 = RBACUtils.create_permission(test_db, "cache_perm3", "Permission 3")
+        RBACUtils.bulk_assign_permissions(test_db, cached_role.role.role_id, [perm3.permission_id])
+        assert self._names(user, test_db) == {"cache_perm2", "cache_perm3"}
+    
+    def test_invalidated_by_permission_delete(self, test_db, cached_role):
+        """Test deleting a permission drops it from the cached grants."""
+        user = cached_role.user
+        perm2 = RBACUtils.create_permission(test_db, "cache_perm2", "Permission 2")
+        RBACUtils.assign_permission_to_role(test_db, cached_role.role.role_id, perm2.permission_id)
+        assert self._names(user, test_db) == {"cache_perm1", "cache_perm2"}
+        
+        # Deleting the permission removes its role_permissions rows through
+        # the Permission.roles relationship
+        test_db.delete(cached_role.perm1)
+        test_db.commit()
+        assert self._names(user, test_db) == {"cache_perm2"}
+    
+    def test_invalidated_by_role_change(self, test_db, cached_role):
+        """Test moving the user to another role refreshes the cache."""
+        user = cached_role.user
+        assert self._names(user, test_db) == {"cache_perm1"}
+        
+        other_role = RBACUtils.create_role(test_db, "cache_role2", "Other role")
+        perm2 = RBACUtils.create_permission(test_db, "cache_perm2", "Permission 2")
+        RBACUtils.assign_permission_to_role(test_db, other_role.role_id, perm2.permission_id)
+        user.role_id = other_role.role_id
+        assert self._names(user, test_db) == {"cache_perm2"}
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file